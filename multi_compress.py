@@ -16,10 +16,17 @@ version_added: "1.1.8"
 
 description:
     - This module provides functionality for archiving and unarchiving files and directories.
-    - Supports tar.gz, tar.bz2, and zip formats.
+    - Supports tar.gz, tar.bz2, tar.zst, and zip formats.
     - Allows for the use of pigz for parallel gzip compression and decompression, providing performance benefits on multicore systems.
+    - Prefers rapidgzip for parallel gzip decompression when it is installed.
+    - Uses lbzip2 or pbzip2 for parallel bzip2 compression and decompression when either is installed.
+    - Supports multithreaded zstd compression, which scales better than gzip on many-core systems.
     - Offers options to include or exclude specific files or patterns.
     - Can automatically detect the archive format for unarchiving operations.
+    - Archiving is skipped when the destination was built with the same options and every file it would contain has an older mtime than the start of that build.
+      The options and the start time are recorded in a hidden C(.<dest name>.multi_archive) file next to the destination, which is removed again when a build fails.
+    - Archives are written under a temporary name and only moved to the destination once complete.
+    - Supports check mode without running any archiving command.
 
 options:
     source:
@@ -31,15 +38,15 @@ options:
         required: true
         type: str
     format:
-        description: The archive format (tar.gz, tar.bz2, zip). For unarchiving, this is optional and will be auto-detected.
+        description: The archive format (tar.gz, tar.bz2, tar.zst, zip). For unarchiving, this is optional and will be auto-detected.
         required: false
         type: str
-        choices: ['tar.gz', 'tar.bz2', 'zip']
+        choices: ['tar.gz', 'tar.bz2', 'tar.zst', 'zip']
     compression:
-        description: The compression method (none, gzip, pigz). Defaults to none, which uses the default method based on the format.
+        description: The compression method (none, gzip, pigz, zstd, store). Defaults to none, which uses the default method based on the format. For tar.gz, none uses pigz when it is installed. zstd implies the tar.zst format. store writes an uncompressed zip.
         required: false
         type: str
-        choices: ['none', 'gzip', 'pigz']
+        choices: ['none', 'gzip', 'pigz', 'zstd', 'store']
     state:
         description: Whether to archive (archived) or unarchive (unarchived) the source.
         required: true
@@ -51,7 +58,7 @@ options:
         default: false
         type: bool
     include:
-        description: List of files or patterns to include in the archive. Only valid for archiving.
+        description: List of files or patterns, relative to source, to include in the archive. Only valid for archiving.
         required: false
         type: list
         elements: str
@@ -76,6 +83,14 @@ EXAMPLES = r'''
     state: archived
     delete_source: false
 
+# Archive a directory with tar.zst using all cores
+- name: Archive directory with zstd
+  community.general.multi_archive:
+    source: /path/to/directory
+    dest: /path/to/archive.tar.zst
+    compression: zstd
+    state: archived
+
 # Unarchive a tar.gz file with automatic format detection
 - name: Unarchive tar.gz
   community.general.multi_archive:
@@ -133,18 +148,313 @@ format_detected:
 
 
 # Import required libraries
+import concurrent.futures
+import contextlib
+import errno
+import fcntl
+import functools
+import glob
+import hashlib
+import json
+import mmap
 import os
+import stat
 import subprocess
 import shutil
-from ansible.module_utils.basic import AnsibleModule
+import tempfile
+import zipfile
+import zlib
+
+# libarchive (python-libarchive-c) is optional; without it tar is spawned instead
+try:
+    import libarchive
+    HAS_LIBARCHIVE = True
+except ImportError:
+    HAS_LIBARCHIVE = False
+
+# libarchive filter names for the tar based formats
+LIBARCHIVE_FILTERS = {'tar.gz': 'gzip', 'tar.bz2': 'bzip2'}
+
+# Probed once at import so repeated archive operations do not rescan PATH
+PIGZ = shutil.which('pigz')
+RAPIDGZIP = shutil.which('rapidgzip')
+LBZIP2 = shutil.which('lbzip2')
+PBZIP2 = shutil.which('pbzip2')
+
+def cpu_count():
+    """Return the number of CPUs this process is allowed to run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def pigz_block_size(dest):
+    """Return the pigz block size in KiB: 128, or the destination filesystem block size if larger"""
+    try:
+        return max(128, os.statvfs(os.path.dirname(os.path.abspath(dest))).f_bsize // 1024)
+    except OSError:
+        return 128
+
+def pigz_command(dest, independent=False):
+    """Return the pigz compression command for dest, with an explicit thread count"""
+    # Without -p pigz sizes itself from the host CPUs, not the container's share
+    cmd = ["pigz", "-p", str(cpu_count()), "-b", str(pigz_block_size(dest))]
+    if independent:
+        # -i resets the dictionary at every block, trading ratio for faster parallel decompression
+        cmd += ["-i"]
+    return cmd
+
+def bzip2_program():
+    """Return a parallel bzip2 invocation for tar, or None if only bzip2 is installed"""
+    if LBZIP2:
+        return f"lbzip2 -n {cpu_count()}"
+    if PBZIP2:
+        return f"pbzip2 -p{cpu_count()}"
+    return None
+
+def run_command(argv, input=None):
+    """Run a command given as an argument list (no shell) and return its error output"""
+    try:
+        # Output stays bytes; it is only decoded when the command failed and it is reported
+        result = subprocess.run(argv, input=input, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=False)
+    except OSError as e:
+        return (False, str(e))
+    if result.returncode == 0:
+        return (True, '')
+    return (False, result.stdout.decode('utf-8', errors='replace').strip())
+
+@contextlib.contextmanager
+def exclude_file(exclude):
+    """Yield the name of a file listing the exclude patterns for tar, or None without patterns"""
+    if not exclude:
+        yield None
+        return
+    with tempfile.NamedTemporaryFile('w', suffix='.exclude') as patterns:
+        patterns.writelines(f"{pattern}\n" for pattern in exclude)
+        patterns.flush()
+        yield patterns.name
+
+def tar_arguments(argv, members, base, exclude_from):
+    """Return tar argv and stdin for a member list, so neither members nor excludes count against ARG_MAX"""
+    if base:
+        argv = argv + ["-C", base]
+    if exclude_from:
+        # tar matches the patterns itself while it walks, so every entry is only stat()ed once
+        argv = argv + [f"--exclude-from={exclude_from}"]
+    return argv + ["--null", "--files-from=-"], b"".join(os.fsencode(member) + b"\0" for member in members)
+
+def run_tar(argv, members, base, exclude):
+    """Run tar with its member list on stdin and return the error output"""
+    with exclude_file(exclude) as patterns:
+        return run_command(*tar_arguments(argv, members, base, patterns))
+
+# Pipe buffer for the archive pipeline; 1 MiB is the default unprivileged limit on Linux
+PIPE_SIZE = 1024 * 1024
+
+def enlarge_pipe(fd):
+    """Grow a pipe buffer so the pipeline moves data in fewer, larger writes (Linux only)"""
+    if not hasattr(fcntl, 'F_SETPIPE_SZ'):
+        return
+    try:
+        fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+    except OSError:
+        # Above /proc/sys/fs/pipe-max-size; keep the default 64 KiB buffer
+        pass
+
+def run_pipeline(members, base, exclude, compressor, dest):
+    """Run tar | compressor > dest for members and return the error output"""
+    # Both processes share one temporary file for stderr so neither can block on a full pipe
+    with exclude_file(exclude) as patterns, open(dest, 'wb', buffering=0) as out, \
+            tempfile.TemporaryFile() as errors:
+        producer, names = tar_arguments(["tar", "-cf", "-"], members, base, patterns)
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            first = subprocess.Popen(producer, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=errors)
+        except OSError as e:
+            return (False, str(e))
+        enlarge_pipe(first.stdout.fileno())
+        try:
+            second = subprocess.Popen(compressor, stdin=first.stdout, stdout=out, stderr=errors)
+        except OSError as e:
+            first.kill()
+            first.wait()
+            return (False, str(e))
+        # Drop our copy of the pipe so tar sees EPIPE if the compressor dies
+        first.stdout.close()
+        try:
+            # tar reads the list while it archives; its output goes to the compressor, not to us
+            first.stdin.write(names)
+            first.stdin.close()
+        except BrokenPipeError:
+            pass
+        success = second.wait() == 0 and first.wait() == 0
+        if success:
+            return (True, '')
+        errors.seek(0)
+        return (False, errors.read().decode('utf-8', errors='replace').strip())
+
+def scan_directory(path):
+    """Return the entries of a directory, closing it before they are visited"""
+    with os.scandir(path) as it:
+        return list(it)
+
+def walk_tree(root):
+    """Yield (path, stat) for root and everything below it, depth first, like tar does"""
+    # A plain walk, not a faster one: on POSIX DirEntry.stat() is still one lstat per entry
+    st = os.lstat(root)
+    yield root, st
+    if not stat.S_ISDIR(st.st_mode):
+        return
+    # An explicit stack instead of recursion, so deep trees cannot hit the recursion limit
+    stack = [iter(scan_directory(root))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        yield entry.path, entry.stat(follow_symlinks=False)
+        if entry.is_dir(follow_symlinks=False):
+            stack.append(iter(scan_directory(entry.path)))
+
+def expand_patterns(base, patterns):
+    """Expand include wildcards relative to base, keeping entries without matches as given"""
+    members = []
+    for pattern in patterns:
+        matches = glob.glob(os.path.join(glob.escape(base), pattern), recursive=True)
+        if not os.path.isabs(pattern):
+            matches = [os.path.relpath(match, base) for match in matches]
+        members.extend(sorted(matches) or [pattern])
+    return members
+
+# Stored zips of single files above this size bypass zip and copy the data in the kernel
+KERNEL_COPY_THRESHOLD = 4 * 1024 * 1024
+
+def copy_range(src_fd, dst_fd, size):
+    """Copy size bytes from src_fd to dst_fd without passing them through user space"""
+    use_copy_file_range = hasattr(os, 'copy_file_range')
+    while size > 0:
+        if use_copy_file_range:
+            try:
+                copied = os.copy_file_range(src_fd, dst_fd, size)
+            except OSError as e:
+                # Cross-filesystem copies and old kernels fall back to sendfile
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL):
+                    raise
+                use_copy_file_range = False
+                continue
+        else:
+            copied = os.sendfile(dst_fd, src_fd, None, size)
+        if copied == 0:
+            raise OSError(errno.EIO, "Source file shrank while it was being archived")
+        size -= copied
 
-def run_command(command):
-    """Run shell command and return the output"""
+def write_stored_zip(source, dest):
+    """Write a single file into an uncompressed zip, copying its data in the kernel"""
+    try:
+        with open(source, 'rb') as src:
+            # A stored member still needs its CRC; computing it over a mapping avoids copying the data
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                crc = zlib.crc32(view)
+            zinfo = zipfile.ZipInfo.from_file(source)
+            zinfo.compress_type = zipfile.ZIP_STORED
+            zinfo.CRC = crc
+            zinfo.compress_size = zinfo.file_size
+            with zipfile.ZipFile(dest, 'w', zipfile.ZIP_STORED) as zf:
+                zinfo.header_offset = zf.fp.tell()
+                zf.fp.write(zinfo.FileHeader())
+                zf.fp.flush()
+                copy_range(src.fileno(), zf.fp.fileno(), zinfo.file_size)
+                zf.fp.seek(0, os.SEEK_END)
+                # Register the member so close() lists it in the central directory
+                zf.filelist.append(zinfo)
+                zf.NameToInfo[zinfo.filename] = zinfo
+                zf.start_dir = zf.fp.tell()
+        return (True, '')
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        return (False, str(e))
+
+def write_with_libarchive(dest, format, paths):
+    """Write a tar archive in-process with libarchive and return the result"""
+    try:
+        with libarchive.file_writer(dest, 'gnutar', LIBARCHIVE_FILTERS[format]) as archive:
+            # lookup=True records user/group names like GNU tar, not only numeric ids
+            archive.add_files(*paths, lookup=True)
+        return (True, '')
+    except libarchive.ArchiveError as e:
+        return (False, str(e))
+
+# Files removed per thread pool task; keeps per-future overhead small on huge trees
+UNLINK_BATCH = 256
+
+def unlink_all(paths):
+    """Unlink a batch of files"""
+    for path in paths:
+        os.unlink(path)
+
+def fast_rmtree(path):
+    """Remove a directory tree, unlinking its files from a thread pool"""
+    files = []
+    dirs = [path]
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+    batches = [files[i:i + UNLINK_BATCH] for i in range(0, len(files), UNLINK_BATCH)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, cpu_count() * 4)) as pool:
+        # Consuming the results re-raises the first unlink error
+        list(pool.map(unlink_all, batches))
+    # Parents were collected before their children, so reverse order empties them first
+    for directory in reversed(dirs):
+        os.rmdir(directory)
+
+def build_record_path(dest):
+    """Return the path of the hidden file recording which options dest was built with, and when"""
+    return os.path.join(os.path.dirname(dest), f".{os.path.basename(dest)}.multi_archive")
+
+def build_id(source, format, compression, include, exclude):
+    """Return a digest of the options that decide the contents of an archive"""
+    # The patterns, not their matches: once delete_source removed the source they match nothing
+    options = [os.path.abspath(source), format, compression, include, exclude]
+    return hashlib.sha256(json.dumps(options).encode('utf-8')).hexdigest()
+
+def read_build_record(dest):
+    """Return the build id and start time in nanoseconds recorded for dest, or (None, 0)"""
     try:
-        output = subprocess.check_output(command, shell=True, stderr=subprocess.STDOUT, universal_newlines=True)
-        return (True, output.strip())
-    except subprocess.CalledProcessError as e:
-        return (False, e.output.strip())
+        with open(build_record_path(dest)) as f:
+            build, started = f.read().split()
+        return (build, int(started))
+    except (OSError, ValueError):
+        return (None, 0)
+
+def remove_build_record(dest):
+    """Remove the build record of dest, if there is one"""
+    try:
+        os.remove(build_record_path(dest))
+    except OSError:
+        pass
+
+def archive_is_current(dest, build, members, base):
+    """Return True if dest was built with the same options and is newer than everything it would contain"""
+    # Without a matching record there is nothing to compare, so the tree is not walked at all
+    recorded, started = read_build_record(dest)
+    if recorded != build or not os.path.exists(dest):
+        return False
+    try:
+        # Compared with the start of the build, not the archive mtime: a file changed while it
+        # was being archived is newer than the start but older than the finished archive.
+        # Directory mtimes change on deletions too, so removed files are noticed as well.
+        # Excluded entries are walked too: a change to one costs a rebuild, never a stale archive.
+        # all() stops at the first newer entry, so a changed source is only walked partially
+        roots = [os.path.join(base, member) if base else member for member in members]
+        return all(st.st_mtime_ns < started for root in roots for _, st in walk_tree(root))
+    except OSError:
+        return False
 
 def archive(module, **kwargs):
     # Access to the arguments via kwargs
@@ -158,37 +468,115 @@ def archive(module, **kwargs):
     
 #    module.log(msg=f"delete_source is set to {delete_source}")    
     """Extend the archiving function with optional compression."""
-    cmd = "tar"
+    cmd = ["tar"]
+    compressor = None
     
-    if format in ["tar.gz", "tar.bz2"]:
-        if format == "tar.gz":
-            cmd += " -z" if compression == "none" else " -I pigz"
-        elif format == "tar.bz2":
-            cmd += " -j"
-        
-        cmd += f" -cf {dest}"
-        
-        if exclude:
-            for pattern in exclude:
-                cmd += f" --exclude='{pattern}'"
-        if include:
-            cmd += " " + " ".join(include)
-        else:
-            cmd += f" {source}"
-    elif format == "zip":
-        # ZIP format logic remains unchanged
-        cmd = f"zip -r {dest} {source}"
-    else:
+    if compression == "zstd" and format in [None, "tar.zst"]:
+        format = "tar.zst"
+    elif compression == "zstd":
+        module.fail_json(msg=f"zstd compression is not supported for the {format} format")
+    if compression == "store" and format != "zip":
+        module.fail_json(msg=f"store compression is not supported for the {format} format")
+    if format not in ["tar.gz", "tar.bz2", "tar.zst", "zip"]:
         module.fail_json(msg=f"Unsupported format: {format}")
-
-    success, output = run_command(cmd)
-    if not success:
-        module.fail_json(msg=f"Failed to archive {source}: {output}")
+    
+    # pigz is the default gzip compressor when it is installed
+    use_pigz = format == "tar.gz" and (compression == "pigz" or (compression == "none" and PIGZ is not None))
+    bzip2 = bzip2_program() if format == "tar.bz2" else None
+    # Otherwise the default compression runs in-process through libarchive
+    in_process = format in ["tar.gz", "tar.bz2"] and compression == "none" and not (use_pigz or bzip2) \
+        and HAS_LIBARCHIVE and not (include or exclude)
+    
+    # Include entries are relative to source; without them the whole source is archived
+    members = expand_patterns(source, include) if include else [source]
+    base = source if include else None
+
+    # zip ignores include/exclude and always archives the whole source
+    if format == "zip":
+        members, base, include, exclude = [source], None, [], []
+    build = build_id(source, format, compression, include, exclude)
+    if not os.path.lexists(dest) and not module.check_mode:
+        # A record left behind by a removed archive describes nothing
+        remove_build_record(dest)
+    up_to_date = archive_is_current(dest, build, members, base)
+    if up_to_date or (delete_source and not os.path.lexists(source) and read_build_record(dest)[0] == build
+                      and os.path.exists(dest)):
+        module.exit_json(changed=False, msg=f"{dest} is already up to date.")
+    if module.check_mode:
+        module.exit_json(changed=True, msg=f"{source} would be archived to {dest}.")
+
+    # The archive is written under a temporary name next to dest and only moved into place
+    # once it is complete, so an existing dest is always a finished archive
+    try:
+        workdir = tempfile.mkdtemp(prefix='.multi_archive-', dir=os.path.dirname(os.path.abspath(dest)))
+    except OSError as e:
+        module.fail_json(msg=f"Failed to archive {source}: {e}")
+    # zip appends .zip to names without it, so its temporary name already ends in .zip
+    target = os.path.join(workdir, "archive.zip" if format == "zip" else os.path.basename(dest))
+    record = os.path.join(workdir, "build")
+    finished = False
+    try:
+        # Stamped by the kernel clock that also stamps the source files, before anything is read
+        with open(record, 'w') as f:
+            started = os.fstat(f.fileno()).st_mtime_ns
+        if in_process:
+            # Default compression: deflate/bzip2 in-process, no tar/gzip fork
+            cmd = None
+        elif use_pigz:
+            # tar and pigz run as two processes joined by a pipe, see run_pipeline()
+            cmd = None
+            compressor = pigz_command(target, independent=compression == "pigz") + ["-c"]
+        elif format in ["tar.gz", "tar.bz2", "tar.zst"]:
+            if format == "tar.gz":
+                cmd += ["-z"]
+            elif format == "tar.bz2":
+                # lbzip2/pbzip2 compress independent blocks on all cores
+                cmd += ["-I", bzip2] if bzip2 else ["-j"]
+            elif format == "tar.zst":
+                # -T0 runs one zstd worker per core
+                cmd += ["-I", "zstd -T0 -3"]
+            
+            # Members and excludes are handled by run_tar()
+            cmd += ["-cf", target]
+        elif compression == "store" and os.path.isfile(source) and os.path.getsize(source) > KERNEL_COPY_THRESHOLD:
+            # Large single file, no compression: copied in the kernel, see write_stored_zip()
+            cmd = None
+        else:
+            # -q: zip lists every added file on stdout otherwise
+            cmd = ["zip", "-q", "-r", "-0", target, source] if compression == "store" else ["zip", "-q", "-r", target, source]
+
+        if compressor:
+            success, output = run_pipeline(members, base, exclude, compressor, target)
+        elif cmd and cmd[0] == "tar":
+            success, output = run_tar(cmd, members, base, exclude)
+        elif cmd:
+            success, output = run_command(cmd)
+        elif format == "zip":
+            success, output = write_stored_zip(source, target)
+        else:
+            success, output = write_with_libarchive(target, format, [source])
+        if not success:
+            module.fail_json(msg=f"Failed to archive {source}: {output}")
+
+        try:
+            os.replace(target, dest)
+            with open(record, 'w') as f:
+                f.write(f"{build}\n{started}\n")
+            os.replace(record, build_record_path(dest))
+        except OSError as e:
+            module.fail_json(msg=f"Failed to archive {source} to {dest}: {e}")
+        finished = True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if not finished:
+            # The next run must rebuild, whatever dest holds now
+            remove_build_record(dest)
     
 #    module.warn(f"delete_source is set to {delete_source}")
     if delete_source:
-        if os.path.isdir(source):
-            shutil.rmtree(source)
+        # A symlink to a directory is removed itself, never the tree it points to
+        if os.path.isdir(source) and not os.path.islink(source):
+            fast_rmtree(source)
         else:
             os.remove(source)
 
@@ -199,17 +587,25 @@ def ensure_directory_exists(path):
     if not os.path.isdir(path):
         os.makedirs(path, exist_ok=True)
 
-def detect_archive_format(source):
-    """Detect the archive format based on the file extension."""
-    if source.endswith('.zip'):
-        return 'zip'
-    elif source.endswith('.tar.gz') or source.endswith('.tgz'):
-        return 'tar.gz'
-    elif source.endswith('.tar.bz2') or source.endswith('.tbz'):
-        return 'tar.bz2'
-    else:
-        # If no supported format was recognised, return None or an error
-        return None
+# Archive extensions and their formats, longest first so '.tar.gz' wins over shorter suffixes
+ARCHIVE_EXTENSIONS = tuple(sorted({
+    '.tar.gz': 'tar.gz',
+    '.tgz': 'tar.gz',
+    '.tar.bz2': 'tar.bz2',
+    '.tbz2': 'tar.bz2',
+    '.tbz': 'tar.bz2',
+    '.tar.zst': 'tar.zst',
+    '.tzst': 'tar.zst',
+    '.zip': 'zip',
+}.items(), key=lambda item: len(item[0]), reverse=True))
+
+@functools.lru_cache(maxsize=128)
+def detect_archive_format(name):
+    """Detect the archive format based on the file extension, or return None."""
+    for extension, format in ARCHIVE_EXTENSIONS:
+        if name.endswith(extension):
+            return format
+    return None
 
 def unarchive(module, **kwargs):
     source = kwargs.get('source')
@@ -218,7 +614,8 @@ def unarchive(module, **kwargs):
     delete_source = kwargs.get('delete_source', False)
     
     # Ensure that the target directory exists
-    ensure_directory_exists(dest)
+    if not module.check_mode:
+        ensure_directory_exists(dest)
 
     # Automatically recognise format if not specified
     if not format:
@@ -227,17 +624,28 @@ def unarchive(module, **kwargs):
     cmd = None  # Initialisation of cmd with None
     
     if format == 'zip':
-        cmd = f"unzip -o '{source}' -d '{dest}'"
+        cmd = ["unzip", "-q", "-o", source, "-d", dest]
+    elif format == 'tar.gz' and RAPIDGZIP:
+        cmd = ["tar", f"--use-compress-program=rapidgzip -P {cpu_count()}", "-xf", source, "-C", dest]
+    elif format == 'tar.gz' and PIGZ:
+        cmd = ["tar", f"--use-compress-program=pigz -p {cpu_count()}", "-xf", source, "-C", dest]
     elif format == 'tar.gz':
-        cmd = f"tar -xzf '{source}' -C '{dest}'"
+        cmd = ["tar", "-xzf", source, "-C", dest]
+    elif format == 'tar.bz2' and bzip2_program():
+        cmd = ["tar", f"--use-compress-program={bzip2_program()}", "-xf", source, "-C", dest]
     elif format == 'tar.bz2':
-        cmd = f"tar -xjf '{source}' -C '{dest}'"
+        cmd = ["tar", "-xjf", source, "-C", dest]
+    elif format == 'tar.zst':
+        cmd = ["tar", "--use-compress-program=zstd -T0", "-xf", source, "-C", dest]
     else:
         module.fail_json(msg=f"Unsupported archive format: {format}")
 
+    if cmd and module.check_mode:
+        module.exit_json(changed=True, msg=f"{source} would be unarchived to {dest}.")
+
     if cmd:  # Check whether cmd has a value before it is used
         # Log the executed command
-        module.log(msg=f"Executing command: {cmd}")
+        module.log(msg=f"Executing command: {' '.join(cmd)}")
         success, output = run_command(cmd)
         if not success:
             module.fail_json(msg=f"Failed to unarchive {source}: {output}")
@@ -250,26 +658,16 @@ def unarchive(module, **kwargs):
     else:
         module.fail_json(msg="No command was set for unarchiving, this should not happen.")
 
-
-
-def detect_format(name, default_format='tar.gz'):
-    """Detect the archive format from the file extension"""
-    if name.endswith('.tar.gz') or name.endswith('.tgz'):
-        return 'tar.gz'
-    elif name.endswith('.zip'):
-        return 'zip'
-    elif name.endswith('.tar'):
-        return 'tar'
-    else:
-        return default_format
-
 def main():
+    # Imported here so the helpers above can be used without loading Ansible
+    from ansible.module_utils.basic import AnsibleModule
+
     module_args = {
         'source': {'type': 'str', 'required': True},
         'dest': {'type': 'str', 'required': True},
-        'format': {'type': 'str', 'required': False, 'default': None, 'choices': ['tar.gz', 'tar.bz2', 'zip']},
+        'format': {'type': 'str', 'required': False, 'default': None, 'choices': ['tar.gz', 'tar.bz2', 'tar.zst', 'zip']},
         # Change: Set 'default' for 'format' to None
-        'compression': {'type': 'str', 'required': False, 'default': 'none', 'choices': ['gzip', 'pigz', 'none']},
+        'compression': {'type': 'str', 'required': False, 'default': 'none', 'choices': ['gzip', 'pigz', 'zstd', 'store', 'none']},
         'state': {'type': 'str', 'required': True, 'choices': ['archived', 'unarchived']},
         'delete_source': {'type': 'bool', 'required': False, 'default': False},
         'include': {'type': 'list', 'elements': 'str', 'default': []},
@@ -278,9 +676,11 @@ def main():
 
     module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
 
-    # Determine format based on file extension, if not explicitly specified
+    # Determine format based on file extension, if not explicitly specified:
+    # the archive is the destination when archiving and the source otherwise
     if not module.params['format']:
-        module.params['format'] = detect_archive_format(module.params['source'])
+        archive_path = module.params['dest'] if module.params['state'] == 'archived' else module.params['source']
+        module.params['format'] = detect_archive_format(archive_path)
 
     if module.params['state'] == 'archived':
         archive(module, **module.params)